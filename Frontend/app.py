@@ -1,35 +1,50 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from dotenv import load_dotenv
+import atexit
+import concurrent.futures
+import functools
 import os
+import re
+import threading
+import duckdb
 import pandas as pd
+import pyarrow as pa
 import snowflake.connector
-import matplotlib.pyplot as plt
 
 # ✅ Ensure Streamlit Page Config is the first command
 st.set_page_config(page_title="Snowflake Query & Visualization", layout="wide")
 st.sidebar.title("📊 Navigation")
 
-# ✅ Load environment variables explicitly
-dotenv_path = "/app/.env"
-if os.path.exists(dotenv_path):
-    load_dotenv(dotenv_path)
-else:
-    st.error(f"❌ .env file not found at {dotenv_path}")
+# ✅ Load Environment + Credentials Once per Process (reruns skip the dotenv file work)
+@st.cache_resource
+def load_settings():
+    dotenv_path = "/app/.env"
+    if os.path.exists(dotenv_path):
+        load_dotenv(dotenv_path)
+    return {
+        "user": os.getenv("SNOWFLAKE_USER"),
+        "password": os.getenv("SNOWFLAKE_PASSWORD"),
+        "account": os.getenv("SNOWFLAKE_ACCOUNT"),
+        "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
+        "database": os.getenv("SNOWFLAKE_DATABASE"),
+    }
 
-# ✅ Load Snowflake Credentials from Environment Variables
-SNOWFLAKE_USER = os.getenv("SNOWFLAKE_USER")
-SNOWFLAKE_PASSWORD = os.getenv("SNOWFLAKE_PASSWORD")
-SNOWFLAKE_ACCOUNT = os.getenv("SNOWFLAKE_ACCOUNT")
-SNOWFLAKE_WAREHOUSE = os.getenv("SNOWFLAKE_WAREHOUSE")
-SNOWFLAKE_DATABASE = os.getenv("SNOWFLAKE_DATABASE")
+settings = load_settings()
+SNOWFLAKE_USER = settings["user"]
+SNOWFLAKE_PASSWORD = settings["password"]
+SNOWFLAKE_ACCOUNT = settings["account"]
+SNOWFLAKE_WAREHOUSE = settings["warehouse"]
+SNOWFLAKE_DATABASE = settings["database"]
 
 # ✅ Validate Credentials
 if not all([SNOWFLAKE_USER, SNOWFLAKE_PASSWORD, SNOWFLAKE_ACCOUNT, SNOWFLAKE_DATABASE]):
     st.error("❌ Missing Snowflake credentials or database name. Check your `.env` file or input.")
     st.stop()
 
-# ✅ Function to Establish Snowflake Connection
-def get_snowflake_connection():
+# ✅ Open a Snowflake Connection (cached for the app lifetime, refreshed hourly)
+@st.cache_resource(ttl=3600)
+def open_snowflake_connection():
     try:
         conn = snowflake.connector.connect(
             user=SNOWFLAKE_USER,
@@ -39,75 +54,352 @@ def get_snowflake_connection():
             database=SNOWFLAKE_DATABASE,
             client_session_keep_alive=True,
             login_timeout=60,
-            autocommit=True
+            autocommit=True,
+            client_prefetch_threads=8,
+            session_parameters={
+                "PYTHON_CONNECTOR_QUERY_RESULT_FORMAT": "ARROW",
+                "CLIENT_RESULT_CHUNK_SIZE": 160,
+                "CLIENT_MEMORY_LIMIT": 4096,
+            }
         )
+        atexit.register(conn.close)
         return conn
     except Exception as e:
         st.error(f"❌ Snowflake connection failed: {e}")
         return None
 
-# ✅ Fetch List of Schemas
-def get_schema_list():
+# ✅ Function to Get the Shared Snowflake Connection
+def get_snowflake_connection():
+    conn = open_snowflake_connection()
+    if conn is None:
+        # don't keep a failed connect cached for the whole TTL; retry on the next rerun
+        open_snowflake_connection.clear()
+        return None
+    if conn.is_closed():
+        open_snowflake_connection.clear()
+        conn = open_snowflake_connection()
+    return conn
+
+# ✅ Convert a filters dict into a hashable cache key
+def _filters_key(filters):
+    return tuple(sorted(filters.items())) if filters else None
+
+# ✅ Validate and Quote an Identifier (values are bound as parameters; identifiers are quoted here).
+# Double-quoting with "" escaping represents any name; only empty/control-character names are rejected.
+def quote_ident(name):
+    name = str(name)
+    if not name or re.search(r"[\x00-\x1f\x7f]", name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return '"' + name.replace('"', '""') + '"'
+
+# ✅ Run a Query and Build the DataFrame from Arrow (near-zero-copy conversion)
+def _read_sql_arrow(conn, query, params=None):
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        table = cur.fetch_arrow_all()
+    if table is None:
+        return pd.DataFrame()
+    return table.to_pandas(self_destruct=True, split_blocks=True, date_as_object=False)
+
+# ✅ One Catalog Query for Schemas and Tables (shared by every listing)
+@st.cache_data(ttl=300)
+def get_catalog():
     try:
         conn = get_snowflake_connection()
         if conn:
-            query = "SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA"
-            df = pd.read_sql(query, conn)
-            conn.close()
-            return df["SCHEMA_NAME"].tolist() if "SCHEMA_NAME" in df.columns else []
+            query = f"SELECT TABLE_SCHEMA, TABLE_NAME FROM {SNOWFLAKE_DATABASE}.INFORMATION_SCHEMA.TABLES ORDER BY TABLE_SCHEMA, TABLE_NAME"
+            df = _read_sql_arrow(conn, query)
+            catalog = {}
+            for schema, table in zip(df["TABLE_SCHEMA"], df["TABLE_NAME"]):
+                catalog.setdefault(schema, []).append(table)
+            return catalog
+        return {}
     except Exception as e:
-        st.error(f"❌ Error fetching schema list: {e}")
-        return []
+        st.error(f"❌ Error fetching catalog: {e}")
+        return {}
+
+# ✅ Fetch List of Schemas (from the cached catalog)
+def get_schema_list():
+    return list(get_catalog())
 
-# ✅ Fetch List of Tables
+# ✅ Fetch List of Tables (from the cached catalog)
 def get_table_list(schema):
+    return get_catalog().get(schema, [])
+
+# ✅ Find a Stable Ordering Column (first primary-key column) for Keyset Pagination
+@st.cache_data(ttl=3600)
+def get_order_key(schema, table_name):
     try:
         conn = get_snowflake_connection()
         if conn:
-            query = f"SELECT TABLE_NAME FROM {SNOWFLAKE_DATABASE}.INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = '{schema}'"
-            df = pd.read_sql(query, conn)
-            conn.close()
-            return df["TABLE_NAME"].tolist() if "TABLE_NAME" in df.columns else []
+            query = f'SHOW PRIMARY KEYS IN TABLE {SNOWFLAKE_DATABASE}.{quote_ident(schema)}.{quote_ident(table_name)}'
+            with conn.cursor() as cur:
+                rows = cur.execute(query).fetchall()
+                columns = [desc[0] for desc in cur.description]
+            if not rows:
+                return None
+            keys = sorted((dict(zip(columns, row)) for row in rows), key=lambda key: key.get("key_sequence", 0))
+            return keys[0].get("column_name")
+        return None
     except Exception as e:
-        st.error(f"❌ Error fetching table list: {e}")
+        st.error(f"❌ Error looking up primary key: {e}")
+        return None
+
+# ✅ Snowflake data types treated as numeric when building filter widgets
+_NUMERIC_TYPES = ("NUMBER", "FLOAT", "INT", "INTEGER", "BIGINT", "SMALLINT", "DECIMAL", "NUMERIC", "REAL", "DOUBLE")
+
+# ✅ Snowflake data types that reject MIN/MAX aggregates
+_NO_MINMAX_TYPES = ("BOOLEAN", "VARIANT", "ARRAY", "OBJECT", "GEOGRAPHY", "GEOMETRY")
+
+# ✅ Column Name → Data Type from INFORMATION_SCHEMA (cheap; touches no row data)
+@st.cache_data(ttl=900)
+def get_column_types(schema, table_name):
+    try:
+        conn = get_snowflake_connection()
+        if conn:
+            query = (
+                f"SELECT COLUMN_NAME, DATA_TYPE FROM {SNOWFLAKE_DATABASE}.INFORMATION_SCHEMA.COLUMNS "
+                "WHERE TABLE_SCHEMA = %(schema)s AND TABLE_NAME = %(table_name)s ORDER BY ORDINAL_POSITION"
+            )
+            df = _read_sql_arrow(conn, query, {"schema": schema, "table_name": table_name})
+            return dict(zip(df["COLUMN_NAME"], df["DATA_TYPE"]))
+        return {}
+    except Exception as e:
+        st.error(f"❌ Error fetching column types: {e}")
+        return {}
+
+# ✅ Profile Columns in SQL (approx distinct count + min/max per column, over a 1% sample)
+@st.cache_data(ttl=900)
+def get_column_profile(schema, table_name):
+    try:
+        column_types = get_column_types(schema, table_name)
+        if not column_types:
+            return {}
+        stats = []
+        profiled = []
+        for c, data_type in column_types.items():
+            try:
+                qc = quote_ident(c)
+            except ValueError:
+                continue  # leave the odd column without widgets rather than failing the whole table
+            if data_type in _NO_MINMAX_TYPES:
+                # MIN/MAX are not defined for these types; keep the column's slot aligned
+                stats.append(f'APPROX_COUNT_DISTINCT({qc}), NULL, NULL')
+            else:
+                stats.append(f'APPROX_COUNT_DISTINCT({qc}), MIN({qc}), MAX({qc})')
+            profiled.append((c, data_type))
+        if not stats:
+            return {}
+        local = get_table_snapshot(schema, table_name)
+        if local is not None:
+            # DuckDB supports the same HyperLogLog aggregate, so profile the local mirror
+            row = local.cursor().execute(f'SELECT {", ".join(stats)} FROM "snapshot"').fetchone()
+        else:
+            conn = get_snowflake_connection()
+            if conn is None:
+                return {}
+            stats_query = f'SELECT {", ".join(stats)} FROM {SNOWFLAKE_DATABASE}.{quote_ident(schema)}.{quote_ident(table_name)} SAMPLE (1)'
+            with conn.cursor() as cur:
+                row = cur.execute(stats_query).fetchone()
+        profile = {}
+        for i, (column, data_type) in enumerate(profiled):
+            profile[column] = {"data_type": data_type, "distinct": row[3 * i], "min": row[3 * i + 1], "max": row[3 * i + 2]}
+        return profile
+    except Exception as e:
+        st.error(f"❌ Error profiling columns: {e}")
+        return {}
+
+# ✅ Fetch Distinct Values for a Low-Cardinality Column
+@st.cache_data(ttl=900)
+def get_distinct_values(schema, table_name, column):
+    try:
+        local = get_table_snapshot(schema, table_name)
+        if local is not None:
+            query = f'SELECT DISTINCT {quote_ident(column)} FROM "snapshot" WHERE {quote_ident(column)} IS NOT NULL LIMIT 15'
+            return [r[0] for r in local.cursor().execute(query).fetchall()]
+        conn = get_snowflake_connection()
+        if conn:
+            query = f'SELECT DISTINCT {quote_ident(column)} FROM {SNOWFLAKE_DATABASE}.{quote_ident(schema)}.{quote_ident(table_name)} WHERE {quote_ident(column)} IS NOT NULL LIMIT 15'
+            with conn.cursor() as cur:
+                rows = cur.execute(query).fetchall()
+            return [r[0] for r in rows]
         return []
+    except Exception as e:
+        st.error(f"❌ Error fetching distinct values: {e}")
+        return []
+
+# ✅ Background Executor for Page Prefetch (one pool for the app lifetime)
+@st.cache_resource
+def get_prefetch_executor():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+# ✅ Submit Work to the Executor with the Script Context Attached (so st.error reaches the page)
+def _submit_with_ctx(executor, fn, *args, **kwargs):
+    ctx = get_script_run_ctx()
+
+    def _run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+
+    return executor.submit(_run)
+
+# ✅ Fetch a Page, Preferring a Previously Prefetched Result
+def _fetch_page(schema, table_name, page_args):
+    prefetch = st.session_state.pop("prefetch", None)
+    if prefetch is not None and prefetch[0] == (schema, table_name, tuple(sorted(page_args.items()))):
+        return prefetch[1].result()
+    return fetch_filtered_data(schema, table_name, **page_args)
+
+# ✅ Kick Off a Background Fetch of the Next Page While the Current One Is on Screen
+def _prefetch_page(schema, table_name, page_args):
+    key = (schema, table_name, tuple(sorted(page_args.items())))
+    prefetch = st.session_state.get("prefetch")
+    if prefetch is None or prefetch[0] != key:
+        st.session_state["prefetch"] = (key, _submit_with_ctx(get_prefetch_executor(), fetch_filtered_data, schema, table_name, **page_args))
+
+# ✅ Build the Sidebar Filter Spec Once per Table (the widget loop only reads this dict)
+@st.cache_data(ttl=600)
+def build_filter_spec(schema, table_name):
+    spec = {}
+    for column, stats in get_column_profile(schema, table_name).items():
+        if stats["distinct"] is not None and stats["distinct"] < 15:
+            spec[column] = {"kind": "cat", "values": get_distinct_values(schema, table_name, column)}
+        elif stats["data_type"] in _NUMERIC_TYPES and stats["min"] is not None and stats["max"] is not None:
+            spec[column] = {"kind": "num", "min": int(stats["min"]), "max": int(stats["max"])}
+    return spec
+
+# ✅ Largest table mirrored into the local DuckDB snapshot; bigger tables stay on Snowflake
+_SNAPSHOT_MAX_ROWS = 100000
+
+# ✅ Materialize a Table Snapshot into In-Process DuckDB (one Snowflake pull per table)
+@st.cache_resource(ttl=900)
+def get_table_snapshot(schema, table_name):
+    try:
+        conn = get_snowflake_connection()
+        if conn:
+            table_ref = f'{SNOWFLAKE_DATABASE}.{quote_ident(schema)}.{quote_ident(table_name)}'
+            # Metadata-served in Snowflake, so over-cap tables cost one cheap query, not a 100k-row pull
+            with conn.cursor() as cur:
+                row_count = cur.execute(f'SELECT COUNT(*) FROM {table_ref}').fetchone()[0]
+            if row_count > _SNAPSHOT_MAX_ROWS:
+                return None
+            with conn.cursor() as cur:
+                cur.execute(f'SELECT * FROM {table_ref} LIMIT %(limit)s', {"limit": _SNAPSHOT_MAX_ROWS})
+                batches = list(cur.fetch_arrow_batches())
+            if not batches:
+                return None
+            local = duckdb.connect()
+            local.register("snapshot_arrow", pa.concat_tables(batches))
+            local.execute('CREATE TABLE "snapshot" AS SELECT * FROM snapshot_arrow')
+            return local
+        return None
+    except Exception as e:
+        st.error(f"❌ Error building local snapshot: {e}")
+        return None
+
+# ✅ Build the Paged SELECT Text (placeholder syntax differs between Snowflake and DuckDB).
+# Pure function of hashable args, so the text is built once per filter shape; page flips
+# reuse the cached template and only the bound parameter values change.
+@functools.lru_cache(maxsize=256)
+def _build_page_query(table_ref, filters, order_key=None, has_last_key=False, style="snowflake"):
+    ph = (lambda name: f"%({name})s") if style == "snowflake" else (lambda name: f"${name}")
+    query = f'SELECT * FROM {table_ref}'
+    where_clauses = []
+    if filters:
+        for i, (column, value) in enumerate(filters):
+            if isinstance(value, tuple):
+                where_clauses.append(f'{quote_ident(column)} BETWEEN {ph(f"f{i}_lo")} AND {ph(f"f{i}_hi")}')
+            elif value and value != "":
+                where_clauses.append(f'{quote_ident(column)} = {ph(f"f{i}")}')
+    if order_key and has_last_key:
+        where_clauses.append(f'{quote_ident(order_key)} > {ph("last_key")}')
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    if order_key:
+        query += f' ORDER BY {quote_ident(order_key)} LIMIT {ph("limit")}'
+    else:
+        query += f' LIMIT {ph("limit")} OFFSET {ph("offset")}'
+    return query
+
+# ✅ Build the Bound Parameter Values Matching _build_page_query
+def _page_params(filters, limit, offset, order_key, last_key):
+    params = {"limit": limit}
+    if filters:
+        for i, (column, value) in enumerate(filters):
+            if isinstance(value, tuple):
+                params[f"f{i}_lo"], params[f"f{i}_hi"] = value
+            elif value and value != "":
+                params[f"f{i}"] = value
+    if order_key and last_key is not None:
+        params["last_key"] = last_key
+    if not order_key:
+        params["offset"] = offset
+    return params
+
+# ✅ Downcast Numeric Columns (float64 → float32, int64 → smallest fitting int) before rendering
+def _downcast_numeric(df):
+    for column in df.columns:
+        if df[column].dtype == "float64":
+            df[column] = df[column].astype("float32")
+        elif df[column].dtype == "int64":
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
 
-# ✅ Fetch Data with Filters and Pagination
-def fetch_filtered_data(schema, table_name, offset=0, limit=5000, filters=None):
+# ✅ Fetch Data with Filters and Pagination (filters passed as a hashable tuple, see _filters_key)
+@st.cache_data(ttl=300, max_entries=64)
+def fetch_filtered_data(schema, table_name, offset=0, limit=5000, filters=None, order_key=None, last_key=None):
     try:
+        params = _page_params(filters, limit, offset, order_key, last_key)
+        local = get_table_snapshot(schema, table_name)
+        if local is not None:
+            query = _build_page_query('"snapshot"', filters, order_key, last_key is not None, style="duckdb")
+            table = local.cursor().execute(query, params).arrow()
+            return _downcast_numeric(table.to_pandas(self_destruct=True, split_blocks=True, date_as_object=False))
         conn = get_snowflake_connection()
         if conn:
-            query = f'SELECT * FROM {SNOWFLAKE_DATABASE}.{schema}."{table_name}"'
-            where_clauses = []
-            if filters:
-                for column, value in filters.items():
-                    if isinstance(value, tuple):  
-                        where_clauses.append(f'"{column}" BETWEEN {value[0]} AND {value[1]}')
-                    elif value and value != "":  
-                        where_clauses.append(f'"{column}" = \'{value}\'')
-            
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
-
-            query += f' LIMIT {limit} OFFSET {offset}'
-            df = pd.read_sql(query, conn)
-            conn.close()
+            table_ref = f'{SNOWFLAKE_DATABASE}.{quote_ident(schema)}.{quote_ident(table_name)}'
+            query = _build_page_query(table_ref, filters, order_key, last_key is not None)
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                batches = list(cur.fetch_arrow_batches())
+            if not batches:
+                return pd.DataFrame()
+            df = _downcast_numeric(pa.concat_tables(batches).to_pandas(self_destruct=True, split_blocks=True, date_as_object=False))
             return df if not df.empty else pd.DataFrame()
+        return pd.DataFrame()
     except Exception as e:
         st.error(f"❌ Error fetching filtered data: {e}")
         return pd.DataFrame()
 
-# ✅ Execute Custom SQL Query
-def execute_snowflake_query(query):
+# ✅ Aggregate Value Counts in SQL (full-table GROUP BY instead of counting a client-side sample)
+@st.cache_data(ttl=600)
+def fetch_value_counts(schema, table_name, column, top=30):
     try:
         conn = get_snowflake_connection()
         if conn:
-            df = pd.read_sql(query, conn)
-            conn.close()
-            return df
+            query = (
+                f'SELECT {quote_ident(column)} AS "value", COUNT(*) AS "count" '
+                f'FROM {SNOWFLAKE_DATABASE}.{quote_ident(schema)}.{quote_ident(table_name)} '
+                f'GROUP BY {quote_ident(column)} ORDER BY "count" DESC LIMIT %(top)s'
+            )
+            df = _read_sql_arrow(conn, query, {"top": top})
+            return df.set_index("value")["count"]
+        return pd.Series(dtype="int64")
+    except Exception as e:
+        st.error(f"❌ Error aggregating value counts: {e}")
+        return pd.Series(dtype="int64")
+
+# ✅ Stream a Custom Query's Result Batches (first rows render before the fetch finishes)
+def stream_query_batches(query):
+    try:
+        conn = get_snowflake_connection()
+        if conn:
+            with conn.cursor() as cur:
+                cur.execute(query)
+                for batch in cur.fetch_arrow_batches():
+                    yield _downcast_numeric(batch.to_pandas(self_destruct=True, split_blocks=True, date_as_object=False))
     except Exception as e:
         st.error(f"❌ Error executing query: {e}")
-        return pd.DataFrame()
 
 # ✅ Sidebar - Select Schema
 schemas = get_schema_list()
@@ -127,37 +419,69 @@ if view_option == "View Snowflake Tables" and SNOWFLAKE_SCHEMA:
     if tables:
         selected_table = st.sidebar.selectbox("Select a Table", tables)
         if selected_table:
+            # Issue the independent per-table metadata queries in parallel; the
+            # connector releases the GIL during network I/O
+            executor = get_prefetch_executor()
+            order_key_future = _submit_with_ctx(executor, get_order_key, SNOWFLAKE_SCHEMA, selected_table)
+            filter_spec_future = _submit_with_ctx(executor, build_filter_spec, SNOWFLAKE_SCHEMA, selected_table)
+
             row_limit = st.sidebar.slider("Rows per Page", 100, 10000, 5000, 500)
-            page_number = st.sidebar.number_input("Page Number", min_value=1, value=1, step=1)
-            offset = (page_number - 1) * row_limit
+            order_key = order_key_future.result()
+            if order_key:
+                # Keyset pagination: remember the last ordering value instead of scanning past OFFSET rows
+                page_number = None
+                offset = 0
+                state_key = f"last_key_{SNOWFLAKE_SCHEMA}.{selected_table}"
+            else:
+                page_number = st.sidebar.number_input("Page Number", min_value=1, value=1, step=1)
+                offset = (page_number - 1) * row_limit
 
-            full_df = fetch_filtered_data(SNOWFLAKE_SCHEMA, selected_table, limit=5000)
+            filter_spec = filter_spec_future.result()
             filters = {}
-            if not full_df.empty:
+            if filter_spec:
                 st.sidebar.subheader("🎯 Column Filters")
-                for column in full_df.columns:
-                    unique_values = full_df[column].dropna().unique()
-                    if len(unique_values) < 15:
-                        filters[column] = st.sidebar.selectbox(f"Filter {column}", [""] + list(unique_values))
-                    elif pd.api.types.is_numeric_dtype(full_df[column]):
-                        min_val, max_val = int(full_df[column].min()), int(full_df[column].max())
-                        filters[column] = st.sidebar.slider(f"Filter {column}", min_val, max_val, (min_val, max_val))
-
-            if st.sidebar.button("Apply Filters"):
-                filtered_df = fetch_filtered_data(SNOWFLAKE_SCHEMA, selected_table, offset=offset, limit=row_limit, filters=filters)
-                st.subheader(f"📄 Filtered Data from `{selected_table}` (Page {page_number})")
+                for column, spec in filter_spec.items():
+                    if spec["kind"] == "cat":
+                        filters[column] = st.sidebar.selectbox(f"Filter {column}", [""] + spec["values"])
+                    else:
+                        filters[column] = st.sidebar.slider(f"Filter {column}", spec["min"], spec["max"], (spec["min"], spec["max"]))
+
+            apply_clicked = st.sidebar.button("Apply Filters")
+            next_clicked = bool(order_key) and st.sidebar.button("Next Page ⏭")
+            if apply_clicked and order_key:
+                st.session_state[state_key] = None  # new filters restart from the first page
+            if apply_clicked or next_clicked:
+                if order_key:
+                    page_args = dict(limit=row_limit, filters=_filters_key(filters), order_key=order_key, last_key=st.session_state.get(state_key))
+                    filtered_df = _fetch_page(SNOWFLAKE_SCHEMA, selected_table, page_args)
+                    if not filtered_df.empty and order_key in filtered_df.columns:
+                        last_value = filtered_df[order_key].iloc[-1]
+                        # Unwrap numpy scalars: the connector can't bind int32/float32 values
+                        st.session_state[state_key] = last_value.item() if hasattr(last_value, "item") else last_value
+                    next_args = dict(page_args, last_key=st.session_state.get(state_key))
+                    st.subheader(f"📄 Filtered Data from `{selected_table}`")
+                else:
+                    page_args = dict(offset=offset, limit=row_limit, filters=_filters_key(filters))
+                    filtered_df = _fetch_page(SNOWFLAKE_SCHEMA, selected_table, page_args)
+                    next_args = dict(page_args, offset=offset + row_limit)
+                    st.subheader(f"📄 Filtered Data from `{selected_table}` (Page {page_number})")
                 st.data_editor(filtered_df)
+                if not filtered_df.empty:
+                    _prefetch_page(SNOWFLAKE_SCHEMA, selected_table, next_args)
 
 # ✅ Query Snowflake Table
 if view_option == "Query Snowflake Table" and SNOWFLAKE_SCHEMA:
     st.title("📝 Query Snowflake Table")
     custom_query = st.text_area("Write your SQL Query below:", height=200, value=f"SELECT * FROM {SNOWFLAKE_DATABASE}.{SNOWFLAKE_SCHEMA}.TABLE_NAME LIMIT 100;")
     if st.button("Run Query"):
-        result_df = execute_snowflake_query(custom_query)
-        if not result_df.empty:
-            st.subheader("📄 Query Results")
-            st.data_editor(result_df)
-            st.write(f"✅ Returned {len(result_df)} rows.")
+        st.subheader("📄 Query Results")
+        placeholder = st.empty()
+        chunks = []
+        for chunk in stream_query_batches(custom_query):
+            chunks.append(chunk)
+            placeholder.dataframe(pd.concat(chunks, ignore_index=True))
+        if chunks:
+            st.write(f"✅ Returned {sum(len(chunk) for chunk in chunks)} rows.")
 
 # ✅ Data Visualization
 if view_option == "Visualizations" and SNOWFLAKE_SCHEMA:
@@ -166,20 +490,26 @@ if view_option == "Visualizations" and SNOWFLAKE_SCHEMA:
     if tables:
         selected_table = st.sidebar.selectbox("Select a Table for Visualization", tables)
         if selected_table:
-            sample_df = fetch_filtered_data(SNOWFLAKE_SCHEMA, selected_table, limit=1000)
-            if not sample_df.empty:
-                numeric_columns = sample_df.select_dtypes(include=["number"]).columns.tolist()
-                if numeric_columns:
+            column_types = get_column_types(SNOWFLAKE_SCHEMA, selected_table)
+            numeric_columns = [column for column, data_type in column_types.items() if data_type in _NUMERIC_TYPES]
+            if column_types:
+                plot_type = st.sidebar.radio("Select Plot Type", ["Scatter Plot", "Line Chart", "Bar Chart"])
+                if plot_type == "Bar Chart":
+                    # Frequencies only make sense for categorical axes; prefer non-numeric columns
+                    category_columns = [column for column, data_type in column_types.items() if data_type not in _NUMERIC_TYPES] or list(column_types)
+                    x_column = st.sidebar.selectbox("Select Category Column", category_columns)
+                    if st.sidebar.button("Render Chart"):
+                        # Aggregated over the full table in Snowflake, not a 1000-row sample
+                        value_counts = fetch_value_counts(SNOWFLAKE_SCHEMA, selected_table, x_column)
+                        if not value_counts.empty:
+                            st.bar_chart(value_counts)
+                elif numeric_columns:
                     x_column = st.sidebar.selectbox("Select X-axis Column", numeric_columns)
                     y_column = st.sidebar.selectbox("Select Y-axis Column", numeric_columns)
-                    plot_type = st.sidebar.radio("Select Plot Type", ["Scatter Plot", "Line Chart", "Bar Chart"])
-
-                    fig, ax = plt.subplots(figsize=(8, 5))
-                    if plot_type == "Scatter Plot":
-                        ax.scatter(sample_df[x_column], sample_df[y_column])
-                    elif plot_type == "Line Chart":
-                        ax.plot(sample_df[x_column], sample_df[y_column])
-                    elif plot_type == "Bar Chart":
-                        ax.bar(sample_df[x_column].astype(str), sample_df[y_column])
-
-                    st.pyplot(fig)
+                    if st.sidebar.button("Render Chart"):
+                        sample_df = fetch_filtered_data(SNOWFLAKE_SCHEMA, selected_table, limit=1000)
+                        if not sample_df.empty:
+                            if plot_type == "Scatter Plot":
+                                st.scatter_chart(sample_df, x=x_column, y=y_column)
+                            elif plot_type == "Line Chart":
+                                st.line_chart(sample_df, x=x_column, y=y_column)